@@ -1,157 +1,310 @@
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime, timedelta
+from typing import NamedTuple
 
 st.set_page_config(page_title="Pearls AQI Predictor", layout="wide")
 
 # Custom CSS
-st.markdown("""
-<style>
-    .stApp { background-color: #0e1117; }
-    .metric-card {
-        background: #1e2130;
-        border-radius: 12px;
-        padding: 24px;
-        border: 1px solid #2d3142;
-        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.3);
-    }
-    .metric-label {
-        color: #8b92a7;
-        font-size: 13px;
-        font-weight: 500;
-        margin-bottom: 8px;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-    }
-    .metric-value {
-        color: #ffffff;
-        font-size: 32px;
-        font-weight: 700;
-        margin-bottom: 4px;
-    }
-    .metric-change { font-size: 13px; color: #10b981; }
-    .metric-change.negative { color: #ef4444; }
-    h1, h2, h3 { color: #ffffff !important; font-weight: 600 !important; }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background-color: #1e2130;
-        padding: 4px;
-        border-radius: 8px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        background-color: transparent;
-        color: #8b92a7;
-        border-radius: 6px;
-        padding: 8px 16px;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #ef4444 !important;
-        color: white !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+STYLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'styles.css')
+
+@st.cache_resource
+def load_css():
+    """Read the stylesheet once per process instead of rebuilding it every rerun"""
+    with open(STYLES_PATH, encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
+
+# Stat-card skeletons for the Overview tab; only the numbers are filled in per rerun
+TEMP_CARD_TPL = """
+<div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%);
+            border-radius: 12px; padding: 20px; margin-bottom: 20px;
+            border: 1px solid #3b82f6;'>
+    <p style='color: #3b82f6; font-weight: bold; font-size: 14px;
+             text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
+        🌡️ Temperature
+    </p>
+    <div style='display: flex; justify-content: space-between; margin-bottom: 10px;'>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
+            <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{mean:.2f}°C</p>
+        </div>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>STD DEV</p>
+            <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{std:.2f}</p>
+        </div>
+    </div>
+    <div style='display: flex; justify-content: space-between;'>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MIN</p>
+            <p style='color: #3b82f6; font-size: 18px; font-weight: bold; margin: 0;'>{min:.2f}°C</p>
+        </div>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MAX</p>
+            <p style='color: #ef4444; font-size: 18px; font-weight: bold; margin: 0;'>{max:.2f}°C</p>
+        </div>
+    </div>
+</div>
+"""
+
+HUM_CARD_TPL = """
+<div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%);
+            border-radius: 12px; padding: 20px; margin-bottom: 20px;
+            border: 1px solid #10b981;'>
+    <p style='color: #10b981; font-weight: bold; font-size: 14px;
+             text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
+        💧 Humidity
+    </p>
+    <div style='display: flex; justify-content: space-between;'>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
+            <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{mean:.2f}%</p>
+        </div>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>STD DEV</p>
+            <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{std:.2f}</p>
+        </div>
+    </div>
+</div>
+"""
+
+AQI_CARD_TPL = """
+<div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%);
+            border-radius: 12px; padding: 20px;
+            border: 1px solid #f59e0b;'>
+    <p style='color: #f59e0b; font-weight: bold; font-size: 14px;
+             text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
+        🌫️ Air Quality Index
+    </p>
+    <div style='display: flex; justify-content: space-between;'>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
+            <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{mean:.0f}</p>
+        </div>
+        <div>
+            <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MAX</p>
+            <p style='color: #f59e0b; font-size: 20px; font-weight: bold; margin: 0;'>{max:.0f}</p>
+        </div>
+    </div>
+</div>
+"""
+
+# Upper bound (inclusive) of each AQI band; anything above the last edge is Hazardous
+_AQI_EDGES = np.array([50, 100, 150, 200, 300])
+_AQI_CATS = np.array(["Good", "Moderate", "Unhealthy for Sensitive", "Unhealthy", "Very Unhealthy", "Hazardous"])
+_AQI_COLORS = np.array(["#10b981", "#f59e0b", "#ff6b6b", "#ef4444", "#c026d3", "#7c2d12"])
 
 def get_aqi_category(aqi):
-    """Return AQI category and color based on value"""
-    if aqi <= 50:
-        return "Good", "#10b981"
-    elif aqi <= 100:
-        return "Moderate", "#f59e0b"
-    elif aqi <= 150:
-        return "Unhealthy for Sensitive", "#ff6b6b"
-    elif aqi <= 200:
-        return "Unhealthy", "#ef4444"
-    elif aqi <= 300:
-        return "Very Unhealthy", "#c026d3"
-    else:
-        return "Hazardous", "#7c2d12"
+    """Return AQI category and color based on value (scalar or array)"""
+    idx = np.searchsorted(_AQI_EDGES, aqi, side='left')
+    return _AQI_CATS[idx], _AQI_COLORS[idx]
+
+DATA_PATH = r'C:\Users\hp\Documents\karachi_air_with_aqi_simple_2024.csv'
+PARQUET_PATH = os.path.splitext(DATA_PATH)[0] + '.parquet'
+DATA_COLUMNS = ['timestamp', 'temp', 'humidity', 'wind_speed', 'aqi']
+STAT_COLUMNS = ['temp', 'humidity', 'wind_speed', 'aqi']
+
+class DashboardData(NamedTuple):
+    """Loaded frame plus summary stats and aggregates computed once per process"""
+    df: pd.DataFrame
+    stats: dict
+    hourly: pd.DataFrame
+    dow_stats: pd.DataFrame
+
+def downcast_columns(df):
+    """float32 for the weather columns; aqi to int16 when whole-valued with no gaps, else float"""
+    df = df.astype({'temp': 'float32', 'humidity': 'float32', 'wind_speed': 'float32'}, copy=False)
+    aqi = df['aqi']
+    if aqi.notna().all() and (aqi == aqi.round()).all() and aqi.between(0, np.iinfo(np.int16).max).all():
+        df['aqi'] = aqi.astype('int16')
+    return df
 
-@st.cache_data
-def load_data():
+def build_parquet_cache():
+    """Parse the CSV once and persist it as a typed Parquet sidecar"""
+    # Only parse the columns the dashboard uses, so no column-subset copy is needed later
+    df = pd.read_csv(DATA_PATH, usecols=lambda c: c.strip() in DATA_COLUMNS)
+    df.columns = df.columns.str.strip()
+    df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+    df = df.dropna(subset=['timestamp'])
+    # The only sort: the sidecar is stored in time order and every reader relies on it
+    df = df.sort_values('timestamp', ignore_index=True)
+    # Narrow dtypes are stored in the sidecar too, shrinking the file as well as the frame
+    df = downcast_columns(df)
+    # Write to a temp file and swap it in, so an interrupted write never leaves a
+    # truncated sidecar that looks newer than the CSV
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(PARQUET_PATH) or '.', suffix='.parquet.tmp')
+    os.close(fd)
     try:
-        df = pd.read_csv(r'C:\Users\hp\Documents\karachi_air_with_aqi_simple_2024.csv')
-        df.columns = df.columns.str.strip()
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-        df = df.dropna(subset=['timestamp'])
-        df = df.sort_values('timestamp').reset_index(drop=True)
-        return df
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd', compression_level=3, use_dictionary=True, index=False)
+        os.replace(tmp_path, PARQUET_PATH)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def parquet_cache_is_stale():
+    """True when the sidecar is missing or older than the source CSV"""
+    if not os.path.exists(PARQUET_PATH):
+        return True
+    return os.path.exists(DATA_PATH) and os.path.getmtime(DATA_PATH) > os.path.getmtime(PARQUET_PATH)
+
+def hour_of_day_mean(hours, values):
+    """NaN-skipping mean per hour 0-23 via bincount - no hashing for a dense 24-key group"""
+    ok = ~np.isnan(values)
+    sums = np.bincount(hours[ok], weights=values[ok], minlength=24)
+    counts = np.bincount(hours[ok], minlength=24)
+    with np.errstate(invalid='ignore'):
+        return sums / counts
+
+# ttl lets a long-running server pick up a refreshed CSV without a restart
+@st.cache_resource(show_spinner=False, ttl=3600)
+def load_data_singleton():
+    """Shared across reruns and sessions - callers must not mutate the frame"""
+    try:
+        if parquet_cache_is_stale():
+            build_parquet_cache()
+        # Parquet keeps the timestamp typed and sorted, so no re-parsing here
+        df = pd.read_parquet(PARQUET_PATH, engine='pyarrow', columns=DATA_COLUMNS)
+        # float32 halves the memory traffic of every aggregation below; a no-op for
+        # sidecars written narrow, still needed for ones written before the downcast
+        df = downcast_columns(df)
+        # One fused pass for the stats the dashboard shows; describe() would also compute quartiles
+        stats = df[STAT_COLUMNS].agg(['mean', 'std', 'min', 'max']).to_dict()
+        for col in STAT_COLUMNS:
+            stats[col]['last'] = df[col].iat[-1]
+        # Hour-of-day means for the insights tab, day-of-week patterns for the forecast
+        hours = df['timestamp'].dt.hour.to_numpy()
+        hourly = pd.DataFrame(
+            {col: hour_of_day_mean(hours, df[col].to_numpy()) for col in ['temp', 'wind_speed']},
+            index=pd.RangeIndex(24, name='hour')
+        )
+        dow_stats = df.groupby(df['timestamp'].dt.dayofweek.rename('dow')).agg(
+            aqi_mean=('aqi', 'mean'), aqi_std=('aqi', 'std'), temp_mean=('temp', 'mean')
+        )
+        return DashboardData(df, stats, hourly, dow_stats)
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
         return None
 
-def forecast_simple(df, days=3):
-    """Simple forecast based on historical patterns"""
+# Bounded: the key changes with the data; ttl/max_entries stop stale entries piling up
+@st.cache_data(show_spinner=False, max_entries=4, ttl=24 * 3600)
+def _forecast_aggregates(_df, nrows, last_ts):
+    """Recent-window means, std and trend for the forecast"""
+    # Recent trend (last 14 days); df is already sorted by timestamp.
+    # Slicing the column arrays gives views, so no tail frames are built.
+    recent_aqi_arr = _df['aqi'].to_numpy()[-336:]  # ~14 days of hourly data
+    recent_temp_arr = _df['temp'].to_numpy()[-336:]
+    recent_aqi = np.nanmean(recent_aqi_arr)
+    recent_temp = np.nanmean(recent_temp_arr)
+    recent_std = np.nanstd(recent_aqi_arr, ddof=1)
+    
+    # Calculate simple trend
+    recent_aqi_last3 = np.nanmean(recent_aqi_arr[-72:])
+    aqi_trend = recent_aqi_last3 - recent_aqi
+    return recent_aqi, recent_temp, recent_std, aqi_trend
+
+# Bounded: a new seed per click and a new start date per day both add entries
+@st.cache_data(show_spinner=False, max_entries=32, ttl=24 * 3600)
+def forecast_simple(_df, _dow_stats, nrows, last_ts, start_date, days=3, seed=0):
+    """Simple forecast based on historical patterns.
+    
+    Seeded so repeat clicks hit the cache; start_date keeps the cached
+    dates current.
+    """
     try:
-        df_sorted = df.sort_values('timestamp').copy()
-        
-        # Get day of week patterns
-        df_sorted['dow'] = df_sorted['timestamp'].dt.dayofweek
-        daily_aqi = df_sorted.groupby('dow')['aqi'].agg(['mean', 'std']).to_dict('index')
-        daily_temp = df_sorted.groupby('dow')['temp'].mean().to_dict()
+        rng = np.random.default_rng(seed)
+        recent_aqi, recent_temp, recent_std, aqi_trend = _forecast_aggregates(_df, nrows, last_ts)
         
-        # Recent trend (last 14 days)
-        recent = df_sorted.tail(336)  # ~14 days of hourly data
-        recent_aqi = recent['aqi'].mean()
-        recent_temp = recent['temp'].mean()
+        # All forecast days at once; weekdays with no history fall back to the recent window
+        dates = pd.date_range(start_date + timedelta(days=1), periods=days)
+        dows = dates.dayofweek
+        steps = np.arange(1, days + 1)
+        base_aqi = _dow_stats['aqi_mean'].reindex(dows).fillna(recent_aqi).to_numpy()
+        aqi_std = _dow_stats['aqi_std'].reindex(dows).fillna(recent_std).to_numpy()
+        base_temp = _dow_stats['temp_mean'].reindex(dows).fillna(recent_temp).to_numpy()
         
-        # Calculate simple trend
-        recent_aqi_last3 = recent.tail(72)['aqi'].mean()
-        aqi_trend = recent_aqi_last3 - recent_aqi
+        # Apply trend and add slight variation; one draw covers both series,
+        # scaled to +/-20% of the weekday AQI std and +/-1°C
+        noise = rng.uniform(-1, 1, size=(2, days))
+        predicted_aqi = base_aqi + (aqi_trend * steps * 0.3) + noise[0] * aqi_std * 0.2
+        predicted_temp = base_temp + noise[1]
         
-        forecasts = []
-        
-        for day in range(1, days + 1):
-            fdate = datetime.now() + timedelta(days=day)
-            dow = fdate.weekday()
-            
-            # Get historical pattern for this day of week
-            if dow in daily_aqi:
-                base_aqi = daily_aqi[dow]['mean']
-                aqi_std = daily_aqi[dow]['std']
-            else:
-                base_aqi = recent_aqi
-                aqi_std = recent['aqi'].std()
-            
-            base_temp = daily_temp.get(dow, recent_temp)
-            
-            # Apply trend and add slight variation
-            predicted_aqi = base_aqi + (aqi_trend * day * 0.3) + np.random.uniform(-aqi_std*0.2, aqi_std*0.2)
-            predicted_temp = base_temp + np.random.uniform(-1, 1)
-            
-            forecasts.append({
-                'day': day,
-                'aqi': np.clip(predicted_aqi, 10, 500),
-                'temp': np.clip(predicted_temp, 15, 45),
-                'date': fdate
-            })
+        forecasts = pd.DataFrame({
+            'day': steps,
+            'aqi': np.clip(predicted_aqi, 10, 500),
+            'temp': np.clip(predicted_temp, 15, 45),
+            'date': dates
+        })
         
         return forecasts
     except Exception as e:
         st.error(f"Forecast error: {str(e)}")
         return None
 
+@st.cache_resource(show_spinner=False)
+def build_monthly_fig(_df, nrows, last_ts):
+    """Monthly temperature & humidity trend figure"""
+    # Month-start bins straight off the datetime column, no Period/string keys
+    monthly_data = _df.groupby(pd.Grouper(key='timestamp', freq='MS'))[['temp', 'humidity']].mean().reset_index()
+
+    # Build traces and layout in one Figure call so Plotly validates once
+    traces = [
+        go.Scatter(
+            x=monthly_data['timestamp'], y=monthly_data['temp'],
+            mode='lines+markers', name='Temperature',
+            line=dict(color='#3b82f6', width=3), marker=dict(size=8),
+            fill='tozeroy', fillcolor='rgba(59, 130, 246, 0.1)'
+        ),
+        go.Scatter(
+            x=monthly_data['timestamp'], y=monthly_data['humidity'],
+            mode='lines+markers', name='Humidity',
+            line=dict(color='#ef4444', width=3), marker=dict(size=8),
+            yaxis='y2'
+        )
+    ]
+    layout = go.Layout(
+        title='Monthly Temperature & Humidity Trends',
+        plot_bgcolor='#1e2130', paper_bgcolor='#1e2130',
+        font=dict(color='#ffffff'), height=500,
+        xaxis=dict(showgrid=True, gridcolor='#2d3142', title='Month', tickformat='%Y-%m'),
+        yaxis=dict(showgrid=True, gridcolor='#2d3142',
+                  title=dict(text='Temperature (°C)', font=dict(color='#3b82f6'))),
+        yaxis2=dict(title=dict(text='Humidity (%)', font=dict(color='#ef4444')),
+                   overlaying='y', side='right'),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hovermode='x unified'
+    )
+    fig = go.Figure(data=traces, layout=layout)
+    return fig
+
 # Load data
-df = load_data()
+data = load_data_singleton()
 
-if df is not None and len(df) > 0:
+if data is not None and len(data.df) > 0:
+    df, stats, hourly, dow_stats = data
+    # Cheap dataset fingerprint: cached helpers take the frame as an unhashed _df
+    # argument and are keyed on (nrows, last_ts) instead of hashing every row
+    nrows, last_ts = len(df), df['timestamp'].iat[-1].value
     st.title("🌤️ Pearls AQI Dashboard")
     st.markdown("---")
     
     # Current metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    current_temp = df['temp'].iloc[-1]
-    avg_temp = df['temp'].mean()
+    current_temp = stats['temp']['last']
+    avg_temp = stats['temp']['mean']
     temp_change = ((current_temp - avg_temp) / avg_temp) * 100
     
-    current_humidity = df['humidity'].iloc[-1]
-    avg_humidity = df['humidity'].mean()
+    current_humidity = stats['humidity']['last']
+    avg_humidity = stats['humidity']['mean']
     humidity_change = current_humidity - avg_humidity
     
-    current_wind = df['wind_speed'].iloc[-1]
-    max_wind = df['wind_speed'].max()
+    current_wind = stats['wind_speed']['last']
+    max_wind = stats['wind_speed']['max']
     
     with col1:
         st.metric("Temperature", f"{current_temp:.1f}°C", f"{temp_change:+.1f}%")
@@ -163,7 +316,7 @@ if df is not None and len(df) > 0:
         st.metric("Wind Speed", f"{current_wind:.1f} m/s", f"Max: {max_wind:.1f} m/s")
     
     with col4:
-        current_aqi = df['aqi'].iloc[-1]
+        current_aqi = stats['aqi']['last']
         aqi_cat, aqi_color = get_aqi_category(current_aqi)
         st.metric("Current AQI", f"{current_aqi:.0f}", aqi_cat)
     
@@ -174,150 +327,52 @@ if df is not None and len(df) > 0:
         col_left, col_right = st.columns([2, 1])
         
         with col_left:
-            df['year_month'] = df['timestamp'].dt.to_period('M').astype(str)
-            monthly_data = df.groupby('year_month').agg({
-                'temp': 'mean',
-                'humidity': 'mean'
-            }).reset_index()
-            
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=monthly_data['year_month'], y=monthly_data['temp'],
-                mode='lines+markers', name='Temperature',
-                line=dict(color='#3b82f6', width=3), marker=dict(size=8),
-                fill='tozeroy', fillcolor='rgba(59, 130, 246, 0.1)'
-            ))
-            fig.add_trace(go.Scatter(
-                x=monthly_data['year_month'], y=monthly_data['humidity'],
-                mode='lines+markers', name='Humidity',
-                line=dict(color='#ef4444', width=3), marker=dict(size=8),
-                yaxis='y2'
-            ))
-            fig.update_layout(
-                title='Monthly Temperature & Humidity Trends',
-                plot_bgcolor='#1e2130', paper_bgcolor='#1e2130',
-                font=dict(color='#ffffff'), height=500,
-                xaxis=dict(showgrid=True, gridcolor='#2d3142', title='Month'),
-                yaxis=dict(showgrid=True, gridcolor='#2d3142',
-                          title=dict(text='Temperature (°C)', font=dict(color='#3b82f6'))),
-                yaxis2=dict(title=dict(text='Humidity (%)', font=dict(color='#ef4444')),
-                           overlaying='y', side='right'),
-                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-                hovermode='x unified'
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_monthly_fig(df, nrows, last_ts), use_container_width=True)
         
         with col_right:
             st.markdown("<h3 style='color: #ffffff; margin-bottom: 24px;'>📊 Statistics</h3>", unsafe_allow_html=True)
             
-            temp_stats = df['temp'].describe()
-            st.markdown("""
-            <div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%); 
-                        border-radius: 12px; padding: 20px; margin-bottom: 20px; 
-                        border: 1px solid #3b82f6;'>
-                <p style='color: #3b82f6; font-weight: bold; font-size: 14px; 
-                         text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
-                    🌡️ Temperature
-                </p>
-                <div style='display: flex; justify-content: space-between; margin-bottom: 10px;'>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
-                        <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{:.2f}°C</p>
-                    </div>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>STD DEV</p>
-                        <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{:.2f}</p>
-                    </div>
-                </div>
-                <div style='display: flex; justify-content: space-between;'>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MIN</p>
-                        <p style='color: #3b82f6; font-size: 18px; font-weight: bold; margin: 0;'>{:.2f}°C</p>
-                    </div>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MAX</p>
-                        <p style='color: #ef4444; font-size: 18px; font-weight: bold; margin: 0;'>{:.2f}°C</p>
-                    </div>
-                </div>
-            </div>
-            """.format(temp_stats['mean'], temp_stats['std'], temp_stats['min'], temp_stats['max']), unsafe_allow_html=True)
-            
-            hum_stats = df['humidity'].describe()
-            st.markdown("""
-            <div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%); 
-                        border-radius: 12px; padding: 20px; margin-bottom: 20px; 
-                        border: 1px solid #10b981;'>
-                <p style='color: #10b981; font-weight: bold; font-size: 14px; 
-                         text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
-                    💧 Humidity
-                </p>
-                <div style='display: flex; justify-content: space-between;'>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
-                        <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{:.2f}%</p>
-                    </div>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>STD DEV</p>
-                        <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{:.2f}</p>
-                    </div>
-                </div>
-            </div>
-            """.format(hum_stats['mean'], hum_stats['std']), unsafe_allow_html=True)
-            
-            aqi_stats = df['aqi'].describe()
-            st.markdown("""
-            <div style='background: linear-gradient(135deg, #1e2130 0%, #2d3142 100%); 
-                        border-radius: 12px; padding: 20px; 
-                        border: 1px solid #f59e0b;'>
-                <p style='color: #f59e0b; font-weight: bold; font-size: 14px; 
-                         text-transform: uppercase; letter-spacing: 1px; margin-bottom: 12px;'>
-                    🌫️ Air Quality Index
-                </p>
-                <div style='display: flex; justify-content: space-between;'>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MEAN</p>
-                        <p style='color: #ffffff; font-size: 20px; font-weight: bold; margin: 0;'>{:.0f}</p>
-                    </div>
-                    <div>
-                        <p style='color: #8b92a7; font-size: 11px; margin: 0;'>MAX</p>
-                        <p style='color: #f59e0b; font-size: 20px; font-weight: bold; margin: 0;'>{:.0f}</p>
-                    </div>
-                </div>
-            </div>
-            """.format(aqi_stats['mean'], aqi_stats['max']), unsafe_allow_html=True)
+            st.markdown(TEMP_CARD_TPL.format(**stats['temp']), unsafe_allow_html=True)
+            st.markdown(HUM_CARD_TPL.format(**stats['humidity']), unsafe_allow_html=True)
+            st.markdown(AQI_CARD_TPL.format(**stats['aqi']), unsafe_allow_html=True)
     
     with tab2:
         st.markdown("<h3 style='color: #ffffff;'>🔮 3-Day AQI Forecast</h3>", unsafe_allow_html=True)
         st.markdown("<p style='color: #8b92a7;'>*Predictions based on historical patterns*</p>", unsafe_allow_html=True)
         
+        regenerate = st.checkbox("🎲 New variation on each run", value=False)
+        
         if st.button("🚀 Generate Forecast", type="primary", use_container_width=True):
+            # Bumping the seed bypasses the cached forecast and draws fresh noise
+            if regenerate:
+                st.session_state['forecast_seed'] = st.session_state.get('forecast_seed', 0) + 1
+            seed = st.session_state.get('forecast_seed', 0)
+            
             with st.spinner("Analyzing patterns..."):
-                forecasts = forecast_simple(df, days=3)
+                forecasts = forecast_simple(
+                    df, dow_stats, nrows, last_ts, datetime.now().date(), days=3, seed=seed
+                )
                 
-                if forecasts:
+                if forecasts is not None:
                     st.markdown("<hr style='border-color: #2d3142;'>", unsafe_allow_html=True)
                     st.markdown("<h4 style='color: #ffffff;'>📅 Daily Forecasts</h4>", unsafe_allow_html=True)
-                    fc1, fc2, fc3 = st.columns(3)
                     
-                    for i, fc in enumerate(forecasts):
-                        with [fc1, fc2, fc3][i]:
-                            pred_aqi = fc['aqi']
-                            pred_temp = fc['temp']
-                            fdate = fc['date']
-                            
-                            aqi_cat, aqi_color = get_aqi_category(pred_aqi)
-                            
-                            if pred_temp > 35:
-                                temp_emoji = "🔥"
-                            elif pred_temp > 30:
-                                temp_emoji = "☀️"
-                            elif pred_temp > 25:
-                                temp_emoji = "🌤️"
-                            else:
-                                temp_emoji = "😊"
+                    aqi_cats, aqi_colors = get_aqi_category(forecasts['aqi'].to_numpy())
+                    pred_temps = forecasts['temp'].to_numpy()
+                    temp_emojis = np.select(
+                        [pred_temps > 35, pred_temps > 30, pred_temps > 25],
+                        ["🔥", "☀️", "🌤️"], default="😊"
+                    )
+                    
+                    rows = zip(forecasts.itertuples(index=False), aqi_cats, aqi_colors, temp_emojis)
+                    for col, (fc, aqi_cat, aqi_color, temp_emoji) in zip(st.columns(len(forecasts)), rows):
+                        with col:
+                            pred_aqi = fc.aqi
+                            pred_temp = fc.temp
+                            fdate = fc.date
                             
                             with st.container():
-                                st.markdown(f"<p style='color: #ffffff; font-weight: bold; font-size: 16px;'>DAY {fc['day']} - {fdate.strftime('%a, %b %d')}</p>", unsafe_allow_html=True)
+                                st.markdown(f"<p style='color: #ffffff; font-weight: bold; font-size: 16px;'>DAY {fc.day} - {fdate.strftime('%a, %b %d')}</p>", unsafe_allow_html=True)
                                 st.markdown(f"<p style='text-align: center; color: #8b92a7; font-size: 12px; font-weight: 600;'>AIR QUALITY INDEX</p>", unsafe_allow_html=True)
                                 st.markdown(f"<h2 style='text-align: center; font-size: 48px; color: #ffffff; margin: 10px 0;'>{pred_aqi:.0f}</h2>", unsafe_allow_html=True)
                                 st.markdown(f"<div style='text-align: center;'><span style='background-color: {aqi_color}; color: white; padding: 8px 20px; border-radius: 20px; font-size: 14px; font-weight: 600;'>{aqi_cat}</span></div>", unsafe_allow_html=True)
@@ -350,9 +405,7 @@ if df is not None and len(df) > 0:
             st.markdown("<br>", unsafe_allow_html=True)
             
             try:
-                dft = df.copy()
-                dft['hour'] = dft['timestamp'].dt.hour
-                hw = dft.groupby('hour')['wind_speed'].mean()
+                hw = hourly['wind_speed']
                 bw = hw.idxmax()
                 st.markdown(f"<p style='color: #ffffff; font-weight: bold; font-size: 16px;'>🌊 Best Sea Breeze</p>", unsafe_allow_html=True)
                 st.markdown(f"<p style='color: #ffffff; font-size: 28px; font-weight: bold;'>{int(bw)}:00</p>", unsafe_allow_html=True)
@@ -362,9 +415,7 @@ if df is not None and len(df) > 0:
         
         with c2:
             try:
-                dft = df.copy()
-                dft['hour'] = dft['timestamp'].dt.hour
-                ht = dft.groupby('hour')['temp'].mean()
+                ht = hourly['temp']
                 ph = ht.idxmax()
                 pt = ht.max()
                 st.markdown(f"<p style='color: #ffffff; font-weight: bold; font-size: 16px;'>⚡ Peak Heat (Avoid)</p>", unsafe_allow_html=True)
@@ -376,9 +427,7 @@ if df is not None and len(df) > 0:
             st.markdown("<br>", unsafe_allow_html=True)
             
             try:
-                dft = df.copy()
-                dft['hour'] = dft['timestamp'].dt.hour
-                ct = dft.groupby('hour')['temp'].mean()
+                ct = hourly['temp']
                 ch = ct.idxmin()
                 ctemp = ct.min()
                 st.markdown(f"<p style='color: #ffffff; font-weight: bold; font-size: 16px;'>💧 Best Walk Time</p>", unsafe_allow_html=True)